@@ -11,11 +11,15 @@ from rasa_sdk.events import SlotSet, AllSlotsReset
 from rasa_sdk import Action, Tracker, FormValidationAction
 from rasa_sdk.executor import CollectingDispatcher
 from rasa_sdk.types import DomainDict
-from .utils import Utils
+from .utils import Utils, MORE_THAN_ONE_MESSAGE, json_file_cache, load_json_file, passage_phrase
 
+import asyncio
+import bisect
+import functools
 import logging
 import os
-import json
+from dataclasses import dataclass
+from types import MappingProxyType
 from .customer_tracking_system import TrackingPeople, TrackingGroups
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -26,9 +30,228 @@ LINE_1 = "alpha line"
 LINE_2 = "beta line"
 LINE_3 = "gamma line"
 LINE_4 = "delta line"
+LINE_NAMES = (LINE_1, LINE_2, LINE_3, LINE_4)
+
+# Subject pronoun for each gender
+GENDER_PRONOUNS = {"male": " He ", "female": " She "}
+
+# Slot stored in 'last_updated' for each entity of the contest questions
+ENTITY_TO_SLOT = {"position": "position", "group_ID": "group_ID", "member_group": "member_group", "mark": "score"}
+
+# Answers shared by the contest questions when the requested detail is not in the ranking
+MSG_NO_POSITION = "There is no {kind} in the {position} position. The positions range from first to fourteenth."
+MSG_NO_GROUP_ID = "The group {group_id} did not take part in the contest. The groups number that participated in the contest range from one to fifteen, excluding eleven."
+MSG_NO_MEMBER = "{member_group} did not take part in the contest. If you provided firstname-surname, please provide lastname-firstname to try a new search."
 
 logging.getLogger(__name__)
 
+# ====================================================
+#  Cached JSON data
+# ====================================================
+_RANKING_CACHE = json_file_cache(FILE_PATH_RANKING)
+_DATABASE_CACHE = json_file_cache(FILE_PATH_DATABASE)
+
+def _normalize_member(member):
+    """
+    Normalizes a member name for lookups: lowercased, without leading, trailing or repeated whitespace.
+    """
+    return " ".join(member.split()).lower()
+
+@dataclass(frozen=True)
+class RankingIndex:
+    """
+    Lookup tables used to answer the questions about the contest in constant time.
+
+    The indexed groups are read-only copies of the JSON groups, with the members as a tuple, carrying the pre-joined
+    member list ("_members_joined") and the teammates of each normalized member ("_teammates_by_member").
+
+    Attributes:
+    - by_id (dict): The groups indexed by id.
+    - by_position (dict): The groups indexed by position.
+    - by_member (dict): The groups indexed by normalized member name.
+    - score_keys (list): The negated scores of the groups sorted by decreasing score, to be searched with bisect.
+    - members_by_score, group_ids_by_score, positions_by_score (tuple): The pair of lists (at least, less than)
+      of pre-joined answers, where the i-th entry joins the first i groups by decreasing score or the other ones.
+    """
+    __slots__ = ("by_id", "by_position", "by_member", "score_keys",
+                 "members_by_score", "group_ids_by_score", "positions_by_score")
+
+    by_id: Dict[Any, dict]
+    by_position: Dict[Text, dict]
+    by_member: Dict[Text, dict]
+    score_keys: List[float]
+    members_by_score: tuple
+    group_ids_by_score: tuple
+    positions_by_score: tuple
+
+def _joined_splits(values):
+    """
+    Returns the pair of lists (at least, less than) of the values joined on each side of every split point.
+    """
+    return ([", ".join(values[:i]) for i in range(len(values) + 1)],
+            [", ".join(values[i:]) for i in range(len(values) + 1)])
+
+def _build_ranking_index(data):
+    """
+    Builds the lookup tables used to answer the questions about the contest in constant time.
+
+    Parameters:
+    - data (dict): The parsed ranking JSON data.
+
+    Returns:
+    - RankingIndex: The lookup tables of the ranking.
+    """
+    groups = []
+    for group in data["groups"]:
+        member_keys = [_normalize_member(member) for member in group["group_members"]]
+        teammates = {}
+        for member_key in member_keys:
+            teammates.setdefault(member_key, ", ".join(member for member, key in zip(group["group_members"], member_keys) if key != member_key))
+        # the JSON groups are shared with the other actions, so the derived fields go on a copy, which is made
+        # read-only: the index is shared by all the requests and an answer must never edit a group in place
+        groups.append(MappingProxyType(dict(group, group_members=tuple(group["group_members"]),
+                                            _members_joined=", ".join(group["group_members"]),
+                                            _teammates_by_member=MappingProxyType(teammates))))
+
+    by_id, by_position, by_member = {}, {}, {}
+    for group in groups:
+        # setdefault keeps the first matching group, as the previous linear scans did
+        by_id.setdefault(group["id"], group)
+        by_position.setdefault(group["position"], group)
+        for member_key in group["_teammates_by_member"]:
+            by_member.setdefault(member_key, group)
+
+    # the score answers only need the joined strings, so they are built once for every possible split
+    sorted_by_score = sorted(groups, key=lambda group: group["score"], reverse=True)
+    return RankingIndex(
+        by_id=by_id,
+        by_position=by_position,
+        by_member=by_member,
+        score_keys=[-group["score"] for group in sorted_by_score],
+        members_by_score=_joined_splits([group["_members_joined"] for group in sorted_by_score]),
+        group_ids_by_score=_joined_splits([f"group {group['id']}" for group in sorted_by_score]),
+        positions_by_score=_joined_splits([group["position"] for group in sorted_by_score]),
+    )
+
+def _joined_by_score(index, joined_by_score, score, at_least):
+    """
+    Returns the pre-joined answer string for the groups with a score of at least `score`, or less than `score`.
+
+    Parameters:
+    - index (RankingIndex): The ranking index built by _build_ranking_index.
+    - joined_by_score (tuple): One of the "<field>_by_score" pairs of the index.
+    - score (float): The score threshold.
+    - at_least (bool): True for the groups with score >= `score`, False for the groups with score < `score`.
+
+    Returns:
+    - str: The joined answer, empty if no group matches.
+    """
+    i = bisect.bisect_right(index.score_keys, -score)
+    at_least_strings, less_than_strings = joined_by_score
+    return at_least_strings[i] if at_least else less_than_strings[i]
+
+def _load_ranking():
+    return load_json_file(FILE_PATH_RANKING, _build_ranking_index)
+
+def _load_ranking_index():
+    _load_ranking()
+    return _RANKING_CACHE["index"]
+
+def _load_database():
+    return load_json_file(FILE_PATH_DATABASE)
+
+@functools.lru_cache(maxsize=256)
+def _cached_filter_people(stamp, foi_key):
+    """
+    Filters the people of the database for a given set of fields of interest, memoizing the result.
+
+    Parameters:
+    - stamp (tuple): The (modification time, size) of the database, so that results are invalidated when the file changes.
+    - foi_key (frozenset): The (field, value) pairs of the fields of interest.
+
+    Returns:
+    - tuple: The filtered people and their number.
+    """
+    cp = TrackingPeople(FILE_PATH_DATABASE, LINE_1, LINE_2, LINE_3, LINE_4, None, data=_load_database())
+    cp.foi.update(foi_key)
+    doi = cp.filteringJSON()
+    return tuple(doi), cp.nop
+
+def _filter_people(cp):
+    """
+    Cached replacement of cp.filteringJSON(): filters the people based on cp.foi and updates cp.nop.
+
+    Parameters:
+    - cp (TrackingPeople): The tracking object holding the fields of interest.
+
+    Returns:
+    - tuple: The filtered people.
+    """
+    _load_database()
+    doi, cp.nop = _cached_filter_people(_DATABASE_CACHE["stamp"], _foi_key(cp.foi))
+    return doi
+
+def _foi_key(foi):
+    """
+    Returns a hashable version of the fields of interest: a frozenset of (field, value) pairs, with lists turned into tuples.
+    """
+    return frozenset((key, tuple(value) if isinstance(value, list) else value) for key, value in foi.items())
+
+def _changed_slots(foi, current_slots):
+    """
+    Returns the SlotSet events for the fields of interest whose value differs from the current slot value,
+    so that unchanged slots are not sent back to Rasa. Lists and tuples are compared as tuples.
+    """
+    def as_tuple(value):
+        return tuple(value) if isinstance(value, list) else value
+    return [
+        SlotSet(key, value)
+        for key, value in foi.items()
+        if as_tuple(value) != as_tuple(current_slots.get(key))
+    ]
+
+def _foi_hash(stamp, foi):
+    """
+    Returns a key of the fields of interest and of the database version, stored in the "foi_hash" slot to detect
+    repeated questions. It is built with repr rather than hash, whose string hashes are salted per process, so that
+    it stays the same after a restart of the action server or in another worker.
+
+    Parameters:
+    - stamp (tuple): The (modification time, size) of the database the fields of interest are filtered on.
+    - foi (dict): The fields of interest.
+
+    Returns:
+    - str: The key of the question.
+    """
+    return repr((stamp, sorted(_foi_key(foi))))
+
+@functools.lru_cache(maxsize=1024)
+def _person_description(gender_string, line1_passages, line2_passages, line3_passages, line4_passages):
+    """
+    Builds the sentence describing the passages of a person through the four lines.
+    Only a few combinations of passages occur in practice, so the sentences are memoized.
+
+    Parameters:
+    - gender_string (str): The subject of the sentence (" He ", " She " or " The person number <i> ").
+    - lineN_passages (int): The number of passages through the N-th line.
+
+    Returns:
+    - str: The description of the person.
+    """
+    passages = [f"the {line} {passage_phrase(count)}" for line, count in zip(LINE_NAMES, (line1_passages, line2_passages, line3_passages, line4_passages))]
+    return "".join((gender_string, "crossed ", ", ".join(passages[:-1]), " and ", passages[-1], "."))
+
+async def _run_blocking(function, *args):
+    """
+    Runs a blocking function (file access, JSON parsing, filtering) in the default executor, so that the
+    event loop of the action server keeps serving the other conversations in the meantime.
+    """
+    return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+# Parse both files once at import, so that the first user turn does not pay for it
+_load_ranking()
+_load_database()
+
 # ====================================================
 #  Class: ActionCountPeople(Action)
 # ====================================================
@@ -61,7 +284,7 @@ class ActionCountPeople(Action):
         """
         return "action_count_people"
 
-    def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    async def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         """
         Executes the action, counts and provides the number of people who fulfil certain criteria set by the user.
 
@@ -73,11 +296,12 @@ class ActionCountPeople(Action):
         """
 
         # Extract current entities from the tracker
-        entities = tracker.latest_message.get('entities')
+        entities = tracker.latest_message.get('entities') or []
         current_slots = tracker.current_slot_values()
 
         # Initialize the TrackingPeople
-        cp = TrackingPeople(FILE_PATH_DATABASE, LINE_1, LINE_2, LINE_3, LINE_4, dispatcher, entities)
+        data = await _run_blocking(_load_database)
+        cp = TrackingPeople(FILE_PATH_DATABASE, LINE_1, LINE_2, LINE_3, LINE_4, dispatcher, entities, data=data)
         for key, value in current_slots.items():
             if key in cp.foi:
                 if value is not None and isinstance(value, list):
@@ -85,17 +309,26 @@ class ActionCountPeople(Action):
                 else: 
                     cp.foi[key] = value if value != "None" else None
                     
+        events = []
+
         # Update the field of interest
         if cp.update() is True:
-            # Get the data of interest - that is, the list of people that meet the required specifications.
-            doi = cp.filteringJSON()
+            # the stamp of the database loaded above, without touching the file again on the event loop
+            foi_hash = _foi_hash(_DATABASE_CACHE["stamp"], cp.foi)
+
+            if foi_hash == current_slots.get("foi_hash") and current_slots.get("count_people_answer") is not None:
+                # Same criteria as the previous question: repeat the previous answer without filtering again.
+                dispatcher.utter_message(text=current_slots.get("count_people_answer"))
+            else:
+                # Count the people that meet the required specifications. The cached filter is used rather than
+                # cp.count_matches() so that ActionSubmit can reuse the match list of the same criteria.
+                await _run_blocking(_filter_people, cp)
+                answer = str(cp)
 
-            dispatcher.utter_message(text=str(cp))
+                dispatcher.utter_message(text=answer)
+                events = [SlotSet("foi_hash", foi_hash), SlotSet("count_people_answer", answer)]
                 
-        return [
-            SlotSet(key, value) 
-            for key, value in cp.foi.items()
-        ]
+        return _changed_slots(cp.foi, current_slots) + events
 
 # ====================================================
 #  Class: ActionReset(Action)
@@ -141,15 +374,11 @@ class ActionSlotMapping(Action):
         """
         
         current_group: Dict[Text, Any] = dict()
-
-        # Reset Slots if intent is 'finding_someone'
-        if tracker.get_intent_of_latest_message() == 'finding_someone':
-            new_slot_values = {key: None for key in tracker.current_slot_values().keys()}      
-        else:
-            new_slot_values = {key: value for key, value in tracker.current_slot_values().items()}      
+        # Only the slots updated by the entities are sent back, to keep the action server response small
+        updated_slots: Dict[Text, Any] = dict()
 
         # Extract Entities
-        entities = tracker.latest_message.get('entities')
+        entities = tracker.latest_message.get('entities') or []
         
         for entity in entities:
 
@@ -165,17 +394,20 @@ class ActionSlotMapping(Action):
                 current_group.clear()
                 
                 if entity_value in ["hat", "bag"]:
-                    new_slot_values[entity_value] = neg
+                    updated_slots[entity_value] = neg
             
             # Update Gender Field    
             if "gender" in entity_key:
                 neg = not "negation" in current_group
                 current_group.clear()
-                new_slot_values["gender"] = entity_value if neg is True else "female" if entity_value == "male" and neg is False else "male"
+                updated_slots["gender"] = entity_value if neg is True else "female" if entity_value == "male" and neg is False else "male"
         
-        return [
+        # Reset Slots if intent is 'finding_someone'
+        events = [AllSlotsReset()] if tracker.get_intent_of_latest_message() == 'finding_someone' else []
+
+        return events + [
             SlotSet(key, value) 
-            for key, value in new_slot_values.items()
+            for key, value in updated_slots.items()
         ]
 
 # ====================================================
@@ -186,9 +418,10 @@ class ActionSubmit(Action):
     def name(self) -> Text:
         return "action_submit"
 
-    def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    async def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
             # Initialize the TrackingPeople
-            cp = TrackingPeople(FILE_PATH_DATABASE, LINE_1, LINE_2, LINE_3, LINE_4, dispatcher)
+            data = await _run_blocking(_load_database)
+            cp = TrackingPeople(FILE_PATH_DATABASE, LINE_1, LINE_2, LINE_3, LINE_4, dispatcher, data=data)
             
             # Extract current slot values from the tracker and update corresponding fields in TrackingPeople
             current_slots = tracker.current_slot_values()
@@ -197,32 +430,17 @@ class ActionSubmit(Action):
                     cp.foi[key] = value if value != "None" else None
             
             # Filter JSON data based on the specified criteria (fields of interest)
-            doi = cp.filteringJSON()
-            output_string = ""
+            doi = await _run_blocking(_filter_people, cp)
+            output_parts = []
             # Check if there are filtered people
             if cp.nop != 0:
                 # Iterate through filtered people and construct output string
                 for i, field in enumerate(doi):
-                    if cp.nop == 1:
-                        gender_string = " He " if field["gender"] == "male" else " She " 
-                    elif cp.nop > 1:
-                        gender_string = f" The person number {i+1} "
-                    else: 
-                        dispatcher.utter_message("I encountered problems. Can you formulate your question better?")
-                        return[AllSlotsReset()]
-                    # Convert line passages to string format
-                    line1_passages_string = ""
-                    line1_passages_string = "once" if field["line1_passages"] == 1 else "twice" if field["line1_passages"] == 2 else f'{field["line1_passages"]} times'
-                    line2_passages_string = ""
-                    line2_passages_string = "once" if field["line2_passages"] == 1 else "twice" if field["line2_passages"] == 2 else f'{field["line2_passages"]} times'
-                    line3_passages_string = ""
-                    line3_passages_string = "once" if field["line3_passages"] == 1 else "twice" if field["line3_passages"] == 2 else f'{field["line3_passages"]} times'
-                    line4_passages_string = ""
-                    line4_passages_string = "once" if field["line4_passages"] == 1 else "twice" if field["line4_passages"] == 2 else f'{field["line4_passages"]} times'
-                    # Construct the final output string
-                    output_string += gender_string + f"crossed the alpha line {line1_passages_string}, the beta line {line2_passages_string}, the gamma line {line3_passages_string} and the delta line {line4_passages_string}."
-                # Send the constructed message to the user
-                dispatcher.utter_message(str(cp) + output_string)
+                    gender_string = GENDER_PRONOUNS.get(field["gender"], " She ") if cp.nop == 1 else f" The person number {i+1} "
+                    # Collect the description of the person
+                    output_parts.append(_person_description(gender_string, field["line1_passages"], field["line2_passages"], field["line3_passages"], field["line4_passages"]))
+                # Construct the final output string and send it to the user
+                dispatcher.utter_message("".join([str(cp)] + output_parts))
             else:
                 # If no people are found, send an appropriate message to the user
                 dispatcher.utter_message("I'm sorry. " + str(cp) + " I can assist you by calling the mall security. They will be here in a few seconds.")
@@ -245,7 +463,9 @@ class ValidateFindPersonForm(FormValidationAction):
         domain: DomainDict,
     ) -> Dict[Text, Any]:
         
-        if tracker.get_intent_of_latest_message() != "doubt" and slot_value is not None:
+        intent = tracker.get_intent_of_latest_message()
+
+        if intent != "doubt" and slot_value is not None:
             if slot_value.lower() in ['male', 'm']:
                 return {"gender": "male"}
             elif slot_value.lower() in ['female', 'f']:
@@ -253,7 +473,7 @@ class ValidateFindPersonForm(FormValidationAction):
             else:
                 dispatcher.utter_message(text="Please provide a valid gender (male/female).")
                 return {"gender": None}
-        elif tracker.get_intent_of_latest_message() == "doubt":
+        elif intent == "doubt":
             dispatcher.utter_message(text="It would help me a lot if you would tell me the gender.")
             return {"gender": None} 
         else:
@@ -267,18 +487,7 @@ class ValidateFindPersonForm(FormValidationAction):
         domain: DomainDict,
     ) -> Dict[Text, Any]:        
 
-        if slot_value is not None:
-            if slot_value is not None and isinstance(slot_value, bool):
-                return {"bag": True if slot_value is True else False}
-            elif tracker.get_intent_of_latest_message() == "doubt":
-                dispatcher.utter_message(response="utter_doubt")
-                return {"bag": "None"} 
-            else:
-                if tracker.get_intent_of_latest_message() != "inform":
-                    dispatcher.utter_message(text="Please provide a valid response (yes/no).")
-                return {"bag": None}
-        else:
-            return {"bag": None}
+        return self._validate_yes_no("bag", slot_value, dispatcher, tracker)
 
     def validate_hat(
         self,
@@ -288,18 +497,33 @@ class ValidateFindPersonForm(FormValidationAction):
         domain: DomainDict,
     ) -> Dict[Text, Any]:
         
-        if slot_value is not None:
-            if slot_value is not None and isinstance(slot_value, bool):
-                return {"hat": True if slot_value is True else False}
-            elif tracker.get_intent_of_latest_message() == "doubt":
-                dispatcher.utter_message(response="utter_doubt")
-                return {"hat": "None"} 
-            else:
-                if tracker.get_intent_of_latest_message() != "inform":
-                    dispatcher.utter_message(text="Please provide a valid response (yes/no).")
-                return {"hat": None}
-        else:
-            return {"hat": None}
+        return self._validate_yes_no("hat", slot_value, dispatcher, tracker)
+
+    def _validate_yes_no(self, slot_name: Text, slot_value: Any, dispatcher: CollectingDispatcher, tracker: Tracker) -> Dict[Text, Any]:
+        """
+        Validates a yes/no slot (bag, hat) of the form.
+
+        Parameters:
+        - slot_name (Text): The name of the slot to validate.
+        - slot_value (Any): The value extracted for the slot.
+        - dispatcher (CollectingDispatcher): The dispatcher to send messages to the user.
+        - tracker (Tracker): The conversation tracker containing user input history.
+
+        Returns:
+        - Dict[Text, Any]: The validated value of the slot.
+        """
+        if slot_value is None:
+            return {slot_name: None}
+        if isinstance(slot_value, bool):
+            return {slot_name: slot_value}
+
+        intent = tracker.get_intent_of_latest_message()
+        if intent == "doubt":
+            dispatcher.utter_message(response="utter_doubt")
+            return {slot_name: "None"} 
+        if intent != "inform":
+            dispatcher.utter_message(text="Please provide a valid response (yes/no).")
+        return {slot_name: None}
         
 # ====================================================
 #  Class: ActionCountGroups(Action) 
@@ -328,7 +552,7 @@ class ActionCountGroups(Action):
         """
         return "action_count_groups"
 
-    def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+    async def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         """
         Executes the action, counts and provides the number groups which fulfil certain criteria set by the user.
 
@@ -340,11 +564,12 @@ class ActionCountGroups(Action):
         """
 
         # Extract current entities from the tracker
-        entities = tracker.latest_message.get('entities')
+        entities = tracker.latest_message.get('entities') or []
         current_slots = tracker.current_slot_values()
 
         # Initialize the TrackingGroups
-        cg = TrackingGroups(FILE_PATH_RANKING, dispatcher, entities)
+        data = await _run_blocking(_load_ranking)
+        cg = TrackingGroups(FILE_PATH_RANKING, dispatcher, entities, data=data)
         for key, value in current_slots.items():
             if key in cg.foi:
                 if value is not None and isinstance(value, list):
@@ -354,15 +579,12 @@ class ActionCountGroups(Action):
 
         # Update the field of interest
         if cg.update() is True:
-            # Get the data of interest
-            doi = cg.filteringJSON()
+            # Count the groups of interest, the answer only needs their number
+            cg.count_matches()
 
             dispatcher.utter_message(text=str(cg))
                 
-        return [
-            SlotSet(key, value) 
-            for key, value in cg.foi.items()
-        ]
+        return _changed_slots(cg.foi, current_slots)
         
 # ====================================================
 #  Class: ActionResetOldSlot(Action)
@@ -374,36 +596,22 @@ class ActionResetOldSlot(Action):
 
     def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
 
-        entities = tracker.latest_message.get("entities", [])
+        entities = tracker.latest_message.get("entities") or []
         current_slots = tracker.current_slot_values()
+        last_updated = current_slots.get("last_updated")
         
-        if (len(entities) == 0 and current_slots.get("last_updated") is None):
-            return [SlotSet("last_updated", "zero")]
-
-        if len(entities) == 0 and current_slots.get("last_updated") is not None:
-            return []
+        if not entities:
+            return [SlotSet("last_updated", "zero")] if last_updated is None else []
 
-        if len(entities) == 2 and any(entity.get("value") == "negation" for entity in entities) and any(entity.get("value") == "mark" for entity in entities):
+        if len(entities) == 2 and {"negation", "mark"} <= {entity.get("value") for entity in entities}:
             return []
 
         if len(entities) > 1:
             return [SlotSet("last_updated", "more than one")]
     
-        updated_slot = None
-        for entity in entities:
-            if entity["entity"] == "position":
-                updated_slot = "position"
-            elif entity["entity"] == "group_ID":
-                updated_slot = "group_ID"
-            elif entity["entity"] == "member_group":
-                updated_slot = "member_group"
-            elif entity["entity"] == "mark":
-                updated_slot = "score"
-
-        if updated_slot:
-            return [SlotSet("last_updated", updated_slot)]
-
-        return [SlotSet("last_updated", "wrong entity")]
+        updated_slot = ENTITY_TO_SLOT.get(entities[0]["entity"])
+
+        return [SlotSet("last_updated", updated_slot or "wrong entity")]
     
     
 # ====================================================
@@ -414,44 +622,36 @@ class ActionClassification(Action):
     def name(self) -> Text:
         return "action_classification"
 
-    def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:   
+    async def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:   
     
         current_slots = tracker.current_slot_values()
+        last_updated = current_slots.get("last_updated")
         
         # check the value of the last_updated slot
-        if current_slots.get("last_updated") == "zero":
-            dispatcher.utter_message(text="Sorry, I did not understand who or what I need to research on. Could you rephrase please?") 
-            return []
-        
-        if current_slots.get("last_updated") == "more than one":
-            dispatcher.utter_message(text="I am so sorry, I can only handle one detail at a time for this kind of question. Please stop the conversation, then rephrase. You might ask who achieved a particular position, or, what position was achieved by a particular member or group.") 
-            return [SlotSet("member_group", None), SlotSet("position", None), SlotSet("group_ID", None)]
-        
-        if current_slots.get("last_updated") == "wrong entity":
-            dispatcher.utter_message(text="You provided a wrong entity for this type of research. Please rephrase.") 
-            return []       
+        events = Utils.handle_preamble(tracker, dispatcher, more_than_one_message="I am so sorry, I can only handle one detail at a time for this kind of question. Please stop the conversation, then rephrase. You might ask who achieved a particular position, or, what position was achieved by a particular member or group.")
+        if events is not None:
+            return events
     
-        with open(FILE_PATH_RANKING, 'r') as f:
-           data = json.load(f)
+        index = await _run_blocking(_load_ranking_index)
          
         # if the user refers to a position  
-        if current_slots.get("last_updated") == "position":
+        if last_updated == "position":
             
             position = current_slots.get("position")
-            matching_group = next((group for group in data["groups"] if group["position"] == position), None)
+            matching_group = index.by_position.get(position)
             
             # if the position is in the json file
             if matching_group:
                 group_id = matching_group["id"]
-                group_members = ", ".join(matching_group["group_members"])
+                group_members = matching_group["_members_joined"]
                 dispatcher.utter_message(text= f"The group {group_id}, whose members are {group_members}, ranked in the {position} position.")
                 return []
             else:
-                dispatcher.utter_message(text= f"There is no group or member group in the {position} position. The positions range from first to fourteenth.")
+                dispatcher.utter_message(text=MSG_NO_POSITION.format(kind="group or member group", position=position))
                 return []
 
         # if the user refers to a group_ID
-        if current_slots.get("last_updated") == "group_ID":
+        if last_updated == "group_ID":
             
             group_id_value = current_slots.get("group_ID")
             group_id_value = Utils.word_to_number(group_id_value, dispatcher)
@@ -460,7 +660,7 @@ class ActionClassification(Action):
             if group_id_value == None:
                 return []
 
-            matching_group = next((group for group in data["groups"] if group["id"] == group_id_value), None)
+            matching_group = index.by_id.get(group_id_value)
             
             # if the group number is in the json file
             if matching_group:
@@ -468,15 +668,14 @@ class ActionClassification(Action):
                 dispatcher.utter_message(text= f"The group {group_id_value} reached the {position} position is the contest.")
                 return []
             else:
-                dispatcher.utter_message(text= f"The group {group_id_value} did not take part in the contest. The groups number that participated in the contest range from one to fifteen, excluding eleven.")
+                dispatcher.utter_message(text=MSG_NO_GROUP_ID.format(group_id=group_id_value))
                 return []
 
         # if the user refers to a member_group
-        if current_slots.get("last_updated") == "member_group":
+        if last_updated == "member_group":
             
             member_group = current_slots.get("member_group")
-            member_group_lower = member_group.lower()
-            matching_group = next((group for group in data["groups"] if any(member_group_lower == member.lower() for member in group["group_members"])), None)
+            matching_group = index.by_member.get(_normalize_member(member_group))
             
             # if the member group is in the json file
             if matching_group:
@@ -484,10 +683,10 @@ class ActionClassification(Action):
                 dispatcher.utter_message(text= f"{member_group} and the other member of the group reached the {position} position is the contest.")
                 return []
             else:
-                dispatcher.utter_message(text= f"{member_group} did not take part in the contest. If you provided firstname-surname, please provide lastname-firstname to try a new search.")
+                dispatcher.utter_message(text=MSG_NO_MEMBER.format(member_group=member_group))
                 return []
             
-        if current_slots.get("last_updated") == "score":
+        if last_updated == "score":
             
             score = current_slots.get("score")
             score = Utils.word_to_number(score, dispatcher)
@@ -498,13 +697,7 @@ class ActionClassification(Action):
             if score == None:
                 return []
 
-            if negation is None:
-                matching_groups = [group for group in data["groups"] if group["score"] >= score]
-            else:
-                matching_groups = [group for group in data["groups"] if group["score"] < score]
-            
-            position_values = [", ".join(group["position"]) for group in matching_groups if "position" in group]
-            position_string = ", ".join(position_values)
+            position_string = _joined_by_score(index, index.positions_by_score, score, negation is None)
             string = "have at least a score of" if negation is None else "have a score less than"
             
             if position_string:
@@ -522,28 +715,20 @@ class ActionHavePartecipated(Action):
     def name(self) -> Text:
         return "action_have_partecipated"
 
-    def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:   
+    async def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:   
     
         current_slots = tracker.current_slot_values()
+        last_updated = current_slots.get("last_updated")
         
         # check the value of the last_updated slot
-        if current_slots.get("last_updated") == "zero":
-            dispatcher.utter_message(text="Sorry, I did not understand who or what I need to research on. Could you rephrase please?") 
-            return []
-        
-        if current_slots.get("last_updated") == "more than one":
-            dispatcher.utter_message(text="I am so sorry, I can only handle one detail at a time for this kind of question. Please stop the conversation, then rephrase the question by denoting only one group or one member.") 
-            return [SlotSet("member_group", None), SlotSet("position", None), SlotSet("group_ID", None)]
-        
-        if current_slots.get("last_updated") == "wrong entity":
-            dispatcher.utter_message(text="You provided a wrong entity for this type of research. Please rephrase.") 
-            return []       
+        events = Utils.handle_preamble(tracker, dispatcher, more_than_one_message="I am so sorry, I can only handle one detail at a time for this kind of question. Please stop the conversation, then rephrase the question by denoting only one group or one member.")
+        if events is not None:
+            return events
     
-        with open(FILE_PATH_RANKING, 'r') as f:
-           data = json.load(f)           
+        index = await _run_blocking(_load_ranking_index)
 
         # if the user refers to a group_id
-        if current_slots.get("last_updated") == "group_ID":
+        if last_updated == "group_ID":
             
             group_id_value = current_slots.get("group_ID")
             group_id_value = Utils.word_to_number(group_id_value, dispatcher)
@@ -552,7 +737,7 @@ class ActionHavePartecipated(Action):
             if group_id_value == None:
                 return []
 
-            matching_group = next((group for group in data["groups"] if group["id"] == group_id_value), None)
+            matching_group = index.by_id.get(group_id_value)
             
             # if the group number is in the json file
             if matching_group:
@@ -563,320 +748,218 @@ class ActionHavePartecipated(Action):
                 return []
 
         # if the user refers to a member_group
-        if current_slots.get("last_updated") == "member_group":
+        if last_updated == "member_group":
             
             member_group = current_slots.get("member_group")
-            member_group_lower = member_group.lower()
-            matching_group = next((group for group in data["groups"] if any(member_group_lower == member.lower() for member in group["group_members"])), None)
+            matching_group = index.by_member.get(_normalize_member(member_group))
             
             # if the member group is in the json file
             if matching_group:
                 dispatcher.utter_message(text= f"Yes, {member_group} took part in the contest.")
                 return []
             else:
-                dispatcher.utter_message(text= f"No, {member_group} did not take part in the contest. If you provided firstname-surname, please provide lastname-firstname to try a new search.")
+                dispatcher.utter_message(text="No, " + MSG_NO_MEMBER.format(member_group=member_group))
                 return []
             
-        if current_slots.get("last_updated") == "position":
+        if last_updated == "position":
             dispatcher.utter_message(text= "I am sorry, I am not able to answer if a position has parecipated in the contest. Please stop the conversation, then rephrase.")
             return []
         
-        if current_slots.get("last_updated") == "score":
+        if last_updated == "score":
             dispatcher.utter_message(text= "I am sorry, I am not able to answer if a score has parecipated in the contest. Please stop the conversation, then rephrase.")
             return []
 
 # ====================================================
-#  Class: ActionMembersGroup(Action)
+#  Class: RankingQueryAction
 # ====================================================
-class ActionMembersGroup(Action):
+class RankingQueryAction:
+    """
+    Shared behaviour of the actions answering a question about one detail of the contest ranking.
 
-    def name(self) -> Text:
-        return "action_members_group"
+    The subclasses also derive from Action and only provide name() and the answer hooks
+    (_format_position, _format_group_id, _format_member, the score wording) or override a whole
+    _answer_for_<case> method for the details they cannot be asked about. It is a mixin rather than
+    an Action itself, so that the Rasa SDK does not try to register it as an action of its own.
+    """
+
+    # Message uttered when the user gave more than one detail, and whether to answer the "zero" state
+    MORE_THAN_ONE_MESSAGE = MORE_THAN_ONE_MESSAGE
+    HANDLE_ZERO = True
+
+    # Kind of the answer in MSG_NO_POSITION, and noun and pre-joined answers of the score questions
+    POSITION_KIND = None
+    SCORE_NOUN = None
+    SCORE_ANSWERS = None
+
+    # Method answering each value of the last_updated slot
+    _HANDLERS = {
+        "position": "_answer_for_position",
+        "group_ID": "_answer_for_group_id",
+        "member_group": "_answer_for_member",
+        "score": "_answer_for_score",
+    }
 
     def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:   
     
-        current_slots = tracker.current_slot_values()
-        
-        # check the value of last_updated slot
-        if current_slots.get("last_updated") == "zero":
-            dispatcher.utter_message(text="Sorry, I did not understand who or what I need to research on. Could you rephrase please?") 
-            return []
-        
-        if current_slots.get("last_updated") == "more than one":
-            dispatcher.utter_message(text="I am so sorry, I can only handle one detail at a time for this kind of question. Please stop the conversation, then rephrase the question by denoting only one group or one member or one position.") 
-            return [SlotSet("member_group", None), SlotSet("position", None), SlotSet("group_ID", None)]
+        # check the value of the last_updated slot
+        events = Utils.handle_preamble(tracker, dispatcher, more_than_one_message=self.MORE_THAN_ONE_MESSAGE, handle_zero=self.HANDLE_ZERO)
+        if events is not None:
+            return events
+
+        last_updated = tracker.get_slot("last_updated")
+        index = _load_ranking_index()
         
-        if current_slots.get("last_updated") == "wrong entity":
-            dispatcher.utter_message(text="You provided a wrong entity for this type of research. Please rephrase.") 
-            return []       
-    
-        with open(FILE_PATH_RANKING, 'r') as f:
-           data = json.load(f)
-         
-        # if the user refers to a psotion
-        if current_slots.get("last_updated") == "position":
-            
-            position = current_slots.get("position")
-            matching_group = next((group for group in data["groups"] if group["position"] == position), None)
-            
-            # if the position is in the json file
-            if matching_group:
-                group_members = ", ".join(matching_group["group_members"])
-                dispatcher.utter_message(text= f"The members of the group that ranked in the {position} position are: {group_members}.")
-                return []
-            else:
-                dispatcher.utter_message(text= f"There is no members group in the {position} position. The positions range from first to fourteenth.")
-                return []
+        # dispatch on the value of last_updated slot
+        handler = self._HANDLERS.get(last_updated)
+        message = getattr(self, handler)(dispatcher, tracker, index) if handler is not None else None
+        if message is not None:
+            dispatcher.utter_message(text=message)
+        return []
 
-        # if the user refers to a group_id
-        if current_slots.get("last_updated") == "group_ID":
+    # if the user refers to a position
+    def _answer_for_position(self, dispatcher, tracker, index):
             
-            group_id_value = current_slots.get("group_ID")
-            group_id_value = Utils.word_to_number(group_id_value, dispatcher)
+        position = tracker.get_slot("position")
+        matching_group = index.by_position.get(position)
+        
+        # if the position is in the json file
+        if matching_group:
+            return self._format_position(matching_group, position)
+        return self._format_no_position(position)
+
+    # if the user refers to a group_id
+    def _answer_for_group_id(self, dispatcher, tracker, index):
             
-            # check if the group number is a valid number
-            if group_id_value == None:
-                return []
+        group_id_value = tracker.get_slot("group_ID")
+        group_id_value = Utils.word_to_number(group_id_value, dispatcher)
+        
+        # check if the group number is a valid number
+        if group_id_value == None:
+            return None
 
-            matching_group = next((group for group in data["groups"] if group["id"] == group_id_value), None)
-             
-            # if the group number is in the json file
-            if matching_group:
-                group_members = ", ".join(matching_group["group_members"])
-                dispatcher.utter_message(text= f"The members of group {group_id_value} are: {group_members}.")
-                return []
-            else:
-                dispatcher.utter_message(text= f"The group {group_id_value} did not take part in the contest. The groups number that participated in the contest range from one to fifteen, excluding eleven.")
-                return []
+        matching_group = index.by_id.get(group_id_value)
+         
+        # if the group number is in the json file
+        if matching_group:
+            return self._format_group_id(matching_group, group_id_value)
+        return MSG_NO_GROUP_ID.format(group_id=group_id_value)
 
-        # if the user refers to a member_group
-        if current_slots.get("last_updated") == "member_group":
+    # if the user refers to a member_group
+    def _answer_for_member(self, dispatcher, tracker, index):
             
-            member_group = current_slots.get("member_group")
-            member_group_lower = member_group.lower()
-            matching_group = next((group for group in data["groups"] if any(member_group_lower == member.lower() for member in group["group_members"])), None)
-            
-            # if the member group is in the json file
-            if matching_group:
-                matching_group["group_members"] = [member for member in matching_group["group_members"] if member.lower() != member_group_lower]
-                group_members = ", ".join(matching_group["group_members"])
-                dispatcher.utter_message(text= f"The temmates of {member_group} are: {group_members}.")
-                return []
-            else:
-                dispatcher.utter_message(text= f"{member_group} did not take part in the contest. If you provided firstname-surname, please provide lastname-firstname to try a new search.")
-                return []
+        member_group = tracker.get_slot("member_group")
+        member_group_key = _normalize_member(member_group)
+        matching_group = index.by_member.get(member_group_key)
+        
+        # if the member group is in the json file
+        if matching_group:
+            return self._format_member(matching_group, member_group, member_group_key)
+        return MSG_NO_MEMBER.format(member_group=member_group)
+
+    # if the user refers to a score
+    def _answer_for_score(self, dispatcher, tracker, index):
+            
+        score = tracker.get_slot("score")
+        if isinstance(score, list):
+            score = score[0]
+            score = str(score)
+        score = Utils.word_to_number(score, dispatcher)
+        
+        negation = tracker.get_slot("negation")
+        
+        # check if the score is a valid number
+        if score == None:
+            return None
 
-        # if the user refers to a member_group
-        if current_slots.get("last_updated") == "score":
-            
-            score = current_slots.get("score")
-            score = Utils.word_to_number(score, dispatcher)
-            
-            negation = current_slots.get("negation")
-            
-            # check if the group number is a valid number
-            if score == None:
-                return []
+        answer = _joined_by_score(index, getattr(index, self.SCORE_ANSWERS), score, negation is None)
+        string = "of at least" if negation is None else "less than"
+        
+        if answer:
+            return f"The {self.SCORE_NOUN} that have done a score {string} {score} are: {answer}."
+        return f"No {self.SCORE_NOUN} found with a score {string} {score}."
 
-            if negation is None:
-                matching_groups = [group for group in data["groups"] if group["score"] >= score]
-            else:
-                matching_groups = [group for group in data["groups"] if group["score"] < score]
-            
-       
-            members_group_values = [", ".join(group["group_members"]) for group in matching_groups if "group_members" in group]
-            members_group_string = ", ".join(members_group_values)
-            string = "of at least" if negation is None else "less than"
-            
-            if members_group_string:
-                message = f"The members that have done a score {string} {score} are: {members_group_string}."
-            else:
-                message = f"No members found with a score {string} {score}."
+    def _format_no_position(self, position):
+        return MSG_NO_POSITION.format(kind=self.POSITION_KIND, position=position)
 
-            dispatcher.utter_message(text=message)
-                
-            return []
-            
 # ====================================================
-#  Class: ActionGroupID(Action)
+#  Class: ActionMembersGroup(Action)
 # ====================================================
-class ActionGroupID(Action):
+class ActionMembersGroup(RankingQueryAction, Action):
+
+    POSITION_KIND = "members group"
+    SCORE_NOUN = "members"
+    SCORE_ANSWERS = "members_by_score"
 
     def name(self) -> Text:
-        return "action_group_id"
+        return "action_members_group"
 
-    def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:   
-    
-        current_slots = tracker.current_slot_values()
-        
-        
-        if current_slots.get("last_updated") == "more than one":
-            dispatcher.utter_message(text="I am so sorry, I can only handle one detail at a time for this kind of question. Please stop the conversation, then rephrase the question by denoting only one member or one position.") 
-            return [SlotSet("member_group", None), SlotSet("position", None), SlotSet("group_ID", None)]
-        
-        if current_slots.get("last_updated") == "wrong entity":
-            dispatcher.utter_message(text="You provided a wrong entity for this type of research. Please rephrase.") 
-            return []       
-    
-        with open(FILE_PATH_RANKING, 'r') as f:
-           data = json.load(f)
+    def _format_position(self, group, position):
+        return f"The members of the group that ranked in the {position} position are: {group['_members_joined']}."
 
-        if current_slots.get("last_updated") == "zero":
-            
-            ids = [str(group["id"]) for group in data["groups"]]
+    def _format_group_id(self, group, group_id):
+        return f"The members of group {group_id} are: {group['_members_joined']}."
 
-            id_string = ",".join(ids)
-            
-            if id_string:
-                dispatcher.utter_message(text= f"The groups that took part in the competition are: {id_string}.")
-                return []
-            
-        # if the user refers to a position  
-        if current_slots.get("last_updated") == "position":
-            
-            position = current_slots.get("position")
-            matching_group = next((group for group in data["groups"] if group["position"] == position), None)
-            
-            # if the position is in the json file
-            if matching_group:
-                group_id = matching_group["id"]
-                dispatcher.utter_message(text= f"The group {group_id} ranked in the {position} position.")
-                return []
-            else:
-                dispatcher.utter_message(text= f"There is no group in the {position} position. The positions range from first to fourteenth.")
-                return []
-            
-        # if the user refers to a member group
-        if current_slots.get("last_updated") == "member_group":
-            
-            member_group = current_slots.get("member_group")
-            member_group_lower = member_group.lower()
-            matching_group = next((group for group in data["groups"] if any(member_group_lower == member.lower() for member in group["group_members"])), None)
+    def _format_member(self, group, member_group, member_group_key):
+        return f"The temmates of {member_group} are: {group['_teammates_by_member'][member_group_key]}."
             
-            if matching_group:
-                number = matching_group["id"]
-                dispatcher.utter_message(text= f"Group {number} is the group that {member_group} is part of.")
-                return []
-            else:
-                dispatcher.utter_message(text= f"{member_group} did not take part in the contest. If you provided firstname-surname, please provide lastname-firstname to try a new search.")
-                return []
+# ====================================================
+#  Class: ActionGroupID(Action)
+# ====================================================
+class ActionGroupID(RankingQueryAction, Action):
 
-        if current_slots.get("last_updated") == "score":
-            
-            score = current_slots.get("score")
-            if isinstance(score, list):
-                score = score[0]
-                score = str(score)
-            score = Utils.word_to_number(score, dispatcher)
-            
-            negation = current_slots.get("negation")
-            
-            if score == None:
-                return []
+    MORE_THAN_ONE_MESSAGE = "I am so sorry, I can only handle one detail at a time for this kind of question. Please stop the conversation, then rephrase the question by denoting only one member or one position."
+    # without any detail, all the groups are listed
+    HANDLE_ZERO = False
+    POSITION_KIND = "group"
+    SCORE_NOUN = "groups"
+    SCORE_ANSWERS = "group_ids_by_score"
 
-            if negation is None:
-                matching_groups = [group for group in data["groups"] if group["score"] >= score]
-            else:
-                matching_groups = [group for group in data["groups"] if group["score"] < score]
+    _HANDLERS = dict(RankingQueryAction._HANDLERS, zero="_answer_for_zero")
 
-            group_ids = [f"group {group['id']}" for group in matching_groups if "id" in group]
+    def name(self) -> Text:
+        return "action_group_id"
 
-            group_ids_string = ", ".join(group_ids)
-            string = "of at least" if negation is None else "less than"
+    # if the user does not refer to anything, list all the groups
+    def _answer_for_zero(self, dispatcher, tracker, index):
             
-            if group_ids_string:
-                message = f"The groups that have done a score {string} {score} are: {group_ids_string}."
-            else:
-                message = f"No groups found with a score {string} {score}."
+        data = _load_ranking()
+        ids = [str(group["id"]) for group in data["groups"]]
 
-            dispatcher.utter_message(text=message) 
-            return []
+        id_string = ",".join(ids)
+        
+        if id_string:
+            return f"The groups that took part in the competition are: {id_string}."
+        return None
 
-        if current_slots.get("last_updated") == "group_ID":
-            dispatcher.utter_message(text= "I am sorry, you asked the number of the group when you already gave me this information. Please stop the conversation, then rephrase.")
-            return []
+    def _answer_for_group_id(self, dispatcher, tracker, index):
+        return "I am sorry, you asked the number of the group when you already gave me this information. Please stop the conversation, then rephrase."
+
+    def _format_position(self, group, position):
+        return f"The group {group['id']} ranked in the {position} position."
+
+    def _format_member(self, group, member_group, member_group_key):
+        return f"Group {group['id']} is the group that {member_group} is part of."
     
             
 # ====================================================
 #  Class: ActionScoreDone(Action)
 # ====================================================
-class ActionScoreDone(Action):
+class ActionScoreDone(RankingQueryAction, Action):
 
     def name(self) -> Text:
         return "action_score_done"
 
-    def run(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:   
-    
-        current_slots = tracker.current_slot_values()
-        
-        # check the value of last_updated slot
-        if current_slots.get("last_updated") == "zero":
-            dispatcher.utter_message(text="Sorry, I did not understand who or what I need to research on. Could you rephrase please?") 
-            return []
-        
-        if current_slots.get("last_updated") == "more than one":
-            dispatcher.utter_message(text="I am so sorry, I can only handle one detail at a time for this kind of question. Please stop the conversation, then rephrase the question by denoting only one group or one member or one position.") 
-            return [SlotSet("member_group", None), SlotSet("position", None), SlotSet("group_ID", None)]
-        
-        if current_slots.get("last_updated") == "wrong entity":
-            dispatcher.utter_message(text="You provided a wrong entity for this type of research. Please rephrase.") 
-            return []       
-    
-        with open(FILE_PATH_RANKING, 'r') as f:
-           data = json.load(f)
-         
-        # if the user refers to a position
-        if current_slots.get("last_updated") == "position":
-            
-            position = current_slots.get("position")
-            matching_group = next((group for group in data["groups"] if group["position"] == position), None)
-            
-            # if the position is in the json file
-            if matching_group:
-                score = matching_group["score"]
-                dispatcher.utter_message(text= f"The score done in {position} position is: {score}.")
-                return []
-            else:
-                dispatcher.utter_message(text= f"There is no score for the {position} position. The positions range from first to fourteenth.")
-                return []
+    def _answer_for_score(self, dispatcher, tracker, index):
+        return "I am sorry, you asked me about the score made, but you provide the information about the score. Please stop the conversation, then rephrase."
 
-        # if the user refers to a group_id
-        if current_slots.get("last_updated") == "group_ID":
-            
-            group_id_value = current_slots.get("group_ID")
-            group_id_value = Utils.word_to_number(group_id_value, dispatcher)
-            
-            # check if the group number is a valid number
-            if group_id_value == None:
-                return []
+    def _format_position(self, group, position):
+        return f"The score done in {position} position is: {group['score']}."
 
-            matching_group = next((group for group in data["groups"] if group["id"] == group_id_value), None)
-            
-            # if the group number is in the json file
-            if matching_group:
-                score = matching_group["score"]
-                dispatcher.utter_message(text= f"The score done by group ({group_id_value}) is: {score}.")
-                return []
-            else:
-                dispatcher.utter_message(text= f"The group {group_id_value} did not take part in the contest. The groups number that participated in the contest range from one to fifteen, excluding eleven.")
-                return []
+    def _format_no_position(self, position):
+        return f"There is no score for the {position} position. The positions range from first to fourteenth."
 
-        # if the user refers to a member_group
-        if current_slots.get("last_updated") == "member_group":
-            
-            member_group = current_slots.get("member_group")
-            member_group_lower = member_group.lower()
-            matching_group = next((group for group in data["groups"] if any(member_group_lower == member.lower() for member in group["group_members"])), None)
-            
-            # if the member group is in the json file
-            if matching_group:
-                score = matching_group["score"]
-                dispatcher.utter_message(text= f"The score done by {member_group} and the other member of the group is: {score}.")
-                return []
-            else:
-                dispatcher.utter_message(text= f"{member_group} did not take part in the contest. If you provided firstname-surname, please provide lastname-firstname to try a new search.")
-                return []
+    def _format_group_id(self, group, group_id):
+        return f"The score done by group ({group_id}) is: {group['score']}."
 
-        if current_slots.get("last_updated") == "score":
-            dispatcher.utter_message(text= "I am sorry, you asked me about the score made, but you provide the information about the score. Please stop the conversation, then rephrase.")
-            return []
\ No newline at end of file
+    def _format_member(self, group, member_group, member_group_key):
+        return f"The score done by {member_group} and the other member of the group is: {group['score']}."
@@ -1,14 +1,235 @@
-import json
-from .utils import Utils
+from itertools import chain
+import numpy as np
+from .utils import Utils, load_json_file, passage_phrase
+
+try:
+    # numba compiles the people filter into a single fused pass over the columns, use it when installed
+    from numba import njit
+except ImportError:
+    njit = None
+
+PEOPLE_COLUMNS = ("gender", "bag", "hat", "line1_passages", "line2_passages", "line3_passages", "line4_passages")
+LINE_COLUMNS = PEOPLE_COLUMNS[3:]
+
+# Entities describing a passage through a line
+LINE_ENTITIES = frozenset(("passages", "line"))
+MARK_ENTITIES = frozenset(("mark",))
+
+# Gender meant by a negated gender ("not a male"); any other negated value is read as "male", as before
+OPPOSITE_GENDER = {"male": "female", "female": "male"}
+
+# Type of each people column: the gender is stored as a small integer code (see _people_columns)
+PEOPLE_DTYPE = np.dtype([("gender", np.int8), ("bag", np.bool_), ("hat", np.bool_),
+                         ("line1_passages", np.int16), ("line2_passages", np.int16),
+                         ("line3_passages", np.int16), ("line4_passages", np.int16)])
+
+# The (people list, columns, gender codes) entry of the last people list, replaced in a single assignment
+# so that concurrent filters never mix the columns of two different people lists
+_COLUMNS_CACHE = {"entry": (None, None, None)}
+
+def _people_columns(people):
+    """
+    Return the attributes of the people as separate contiguous NumPy columns, so that they can be filtered with
+    boolean masks that only scan the few bytes per person of the fields they test. The people dicts themselves
+    are only used to build the small list of matching people.
+
+    The columns are rebuilt only when a different people list is given. While building them, the number of
+    passages through each line is also stored in every person.
+
+    Parameters:
+    - people (list): The list of people of the JSON data.
+
+    Returns:
+    - tuple: The dict of NumPy arrays, one for each name in PEOPLE_COLUMNS with the type given by PEOPLE_DTYPE,
+      and the dict mapping each gender to its code.
+    """
+    cached_people, columns, genders = _COLUMNS_CACHE["entry"]
+    if cached_people is not people:
+        genders = {}
+        columns = {
+            "gender": np.array([genders.setdefault(person["gender"], len(genders)) for person in people], dtype=PEOPLE_DTYPE["gender"]),
+            "bag": np.array([person["bag"] for person in people], dtype=PEOPLE_DTYPE["bag"]),
+            "hat": np.array([person["hat"] for person in people], dtype=PEOPLE_DTYPE["hat"]),
+        }
+
+        # count the passages of everybody with a single bincount over the concatenated trajectories,
+        # where each passage is binned by (person, line)
+        lengths = np.fromiter((len(person["trajectory"]) for person in people), dtype=np.intp, count=len(people))
+        lines = np.fromiter(chain.from_iterable(person["trajectory"] for person in people), dtype=np.int64, count=int(lengths.sum()))
+        owners = np.repeat(np.arange(len(people)), lengths)
+        valid = (lines >= 1) & (lines <= 4)
+        passages = np.bincount(owners[valid] * 5 + lines[valid], minlength=len(people) * 5).reshape(len(people), 5)
+
+        for line in range(1, 5):
+            columns[f"line{line}_passages"] = np.ascontiguousarray(passages[:, line], dtype=PEOPLE_DTYPE[f"line{line}_passages"])
+        for person, person_passages in zip(people, passages.tolist()):
+            for line in range(1, 5):
+                person[f"line{line}_passages"] = person_passages[line]
+        _COLUMNS_CACHE["entry"] = (people, columns, genders)
+    return columns, genders
+
+def _match_people(gender, bag, hat, line1, line2, line3, line4, gender_code, bag_code, hat_code, thresholds, modes):
+    """
+    Compute the mask of the people matching the fields of interest in one pass over the columns.
+    Compiled with numba when it is installed, see _filter_arguments for the encoding of the filters.
+
+    Parameters:
+    - gender, bag, hat, line1, line2, line3, line4 (np.ndarray): The columns of the people.
+    - gender_code (int): The gender code to match, -2 for no gender filter.
+    - bag_code, hat_code (int): 1 or 0 to match a bag / hat or its absence, -1 for no filter, 2 to match nobody.
+    - thresholds (np.ndarray): The number of passages of each line filter.
+    - modes (np.ndarray): For each line, 1 for "at least" the threshold, 0 for "less than", -1 for no filter.
+
+    Returns:
+    - np.ndarray: The boolean mask of the matching people.
+    """
+    mask = np.empty(gender.shape[0], dtype=np.bool_)
+    for i in range(gender.shape[0]):
+        keep = ((gender_code == -2 or gender[i] == gender_code)
+                and (bag_code == -1 or bag[i] == bag_code)
+                and (hat_code == -1 or hat[i] == hat_code))
+        for line, passages in enumerate((line1[i], line2[i], line3[i], line4[i])):
+            if keep and modes[line] != -1:
+                keep = passages >= thresholds[line] if modes[line] == 1 else passages < thresholds[line]
+        mask[i] = keep
+    return mask
+
+# The compiled kernel, or None to filter with NumPy masks when numba is not installed
+_match_people_kernel = njit(cache=True)(_match_people) if njit is not None else None
+
+# Fixed order in which the attribute filters are tested when filtering with NumPy, whatever their selectivity on the data
+ATTRIBUTE_FILTER_ORDER = ("gender", "hat", "bag")
+
+def _line_filter_order(item):
+    """
+    Sort key of the line filters, putting first the ones with the strictest threshold: the "at least" filters by
+    decreasing number of passages, then the "less than" filters by increasing number of passages.
+
+    Parameters:
+    - item (tuple): The (column, [passages, crossed]) pair of a line filter.
+
+    Returns:
+    - tuple: The sort key.
+    """
+    passages, crossed = item[1][0], item[1][1]
+    return (0, -passages) if crossed else (1, passages)
+
+def _filter_arguments(foi, genders):
+    """
+    Encode the fields of interest as the scalar and array arguments of _match_people.
+
+    Parameters:
+    - foi (dict): The fields of interest of a TrackingPeople.
+    - genders (dict): The code of each gender, see _people_columns.
+
+    Returns:
+    - tuple: gender_code, bag_code, hat_code, thresholds and modes.
+    """
+    def clothing_code(value):
+        if value is None:
+            return -1
+        # compare like NumPy does: True/False, 1/0 match, anything else matches nobody
+        return int(value) if isinstance(value, (bool, int, float)) and value in (0, 1) else 2
+
+    thresholds = np.zeros(4, dtype=np.float64)
+    modes = np.full(4, -1, dtype=np.int8)
+    for line, key in enumerate(LINE_COLUMNS):
+        value = foi[key]
+        if value is not None:
+            thresholds[line] = value[0]
+            modes[line] = 1 if value[1] else 0
+    gender_code = -2 if foi["gender"] is None else genders.get(foi["gender"], -1)
+    return gender_code, clothing_code(foi["bag"]), clothing_code(foi["hat"]), thresholds, modes
+
+def _run_state_machine(entities, trigger_keys, on_update, on_other=None):
+    """
+    Group the entities of an utterance and apply each complete group, taking negations into account.
+
+    The entities whose key is in `trigger_keys` (e.g. passages and line) are collected in `current_group`, together
+    with a preceding negation, until the group is complete or another kind of entity arrives; the group is then
+    applied with `on_update`. The `trigger_flag` tracks whether such a group is being collected. The other entities
+    are passed to `on_other`, which returns True when it used the current group so that it is cleared.
+
+    Parameters:
+    - entities (list): The entities of the latest user message.
+    - trigger_keys (frozenset): The entity keys that form a group.
+    - on_update (callable): Applies a group, returns False if the update failed.
+    - on_other (callable, optional): Called with (current_group, entity_key, entity_value) for the other entities.
+
+    Returns:
+    - bool: True if the update is successful, False otherwise.
+    """
+    # Initialize an empty dictionary to store the current group of entities.
+    current_group = dict()  
+    # Initialize a flag to track whether a group of trigger entities is being collected.
+    trigger_flag = False
+    # The key last inserted in current_group, to know whether a group ends with a negation.
+    last_key = None
+
+    for entity in entities:
+
+        entity_key = entity['entity']
+        entity_value = entity['value']
+        
+        if entity_key in trigger_keys:
+            if trigger_flag is True and entity_key in current_group:
+                if on_update(current_group) is False:
+                    return False
+                key, value = last_key, current_group.get(last_key)
+                current_group.clear()
+                last_key = None
+                if key == "negation":
+                    current_group[key] = value                    
+                    last_key = key
+            trigger_flag = True
+            neg = False if "negation" in current_group else True
+            if not neg:
+                del current_group["negation"]
+            if entity_key not in current_group:
+                last_key = entity_key
+            current_group[entity_key] = (entity_value, neg)                 
+        else:
+            if trigger_flag is True and entity_key == "negation":
+                pass
+            else: 
+                if trigger_flag is True and entity_key != "negation":
+                    if on_update(current_group) is False:
+                        return False
+                    current_group.clear()
+                trigger_flag = False
+            if entity_key not in current_group:
+                last_key = entity_key
+            current_group[entity_key] = entity_value
+        
+        if trigger_keys.issubset(current_group):
+            if on_update(current_group) is False:
+                return False
+            current_group.clear()
+            trigger_flag = False
+
+        if not trigger_flag and on_other is not None:
+            if on_other(current_group, entity_key, entity_value):
+                current_group.clear()
+
+    # Apply the group if current_group is not empty - that is, there are trigger entities at the end of the utterance.
+    if current_group:
+        if on_update(current_group) is False:
+            return False
+        current_group.clear()
+            
+    return True 
 
 class TrackingPeople:
     
-    def __init__(self, filepath, line_1, line_2, line_3, line_4, dispatcher, entities = None) -> None:
+    def __init__(self, filepath, line_1, line_2, line_3, line_4, dispatcher, entities = None, data = None) -> None:
         self.filepath = filepath
+        self.data = data
         self.line_1 = line_1
         self.line_2 = line_2
         self.line_3 = line_3
         self.line_4 = line_4
+        # field of interest updated for each line name
+        self._line_map = {line_1: "line1_passages", line_2: "line2_passages", line_3: "line3_passages", line_4: "line4_passages"}
         self.foi = {
             "gender": None,
             "bag": None,
@@ -31,7 +252,7 @@ class TrackingPeople:
         
         In order to properly implement the update logic, taking into account negation, and possible placements in the text of the entities related to line, we have defined two variables to implement this:
         - `current_group` is a dictionary that gets cleared each time clothing or gender-related entities are encountered. This approach ensures correct implementation of logic for negation. The management of fields related to the LINE entities is more complex, but still managed by the dictionary.
-        - `line_flag` is a flag used to manage the update of LINE fields, where the logic is more complex than in the previous case. The flag is set to True when updating LINE fields and False when processing other types of entities.
+        - `trigger_flag` is a flag used to manage the update of LINE fields, where the logic is more complex than in the previous case. The flag is set to True when updating LINE fields and False when processing other types of entities.
         
         Parameters:
         - None
@@ -42,71 +263,32 @@ class TrackingPeople:
         Raises:
         - None
         """
-        # Initialize an empty dictionary to store the current group of entities.
-        current_group = dict()  
-        # Initialize a flag to track whether LINE fields are being updated.
-        line_flag = False
-
-        for entity in self.entities:
+        return _run_state_machine(self.entities, LINE_ENTITIES, lambda current_group: self.__update_line(current_group, update=True), self.__update_other)
 
-            entity_key = entity['entity']
-            entity_value = entity['value']
-            
-            if entity_key in ["passages", "line"]:
-                if line_flag is True and entity_key in current_group:
-                    if self.__update_line(current_group, update=True) is False:
-                        return False
-                    key, value = next(reversed(current_group.items()))
-                    current_group.clear()
-                    if key == "negation":
-                        current_group[key] = value                    
-                line_flag = True
-                neg = False if "negation" in current_group else True
-                if not neg:
-                    del current_group["negation"]
-                current_group[entity_key] = (entity_value, neg)                 
-            else:
-                if line_flag is True and entity_key == "negation":
-                    pass
-                else: 
-                    if line_flag is True and entity_key != "negation":
-                        if self.__update_line(current_group, update=True) is False:
-                            return False
-                        current_group.clear()
-                    line_flag = False
-                current_group[entity_key] = entity_value
-            
-            if all(key in current_group for key in ["passages", "line"]):
-                if self.__update_line(current_group, update=True) is False:
-                    return False
-                current_group.clear()
-                line_flag = False
+    def __update_other(self, current_group, entity_key, entity_value):
+        """
+        Update the clothing or gender field for an entity outside of a LINE group.
 
-            if not line_flag:
-                # Update Clothing Fields
-                if "clothing" in entity_key:  
-                    self.__update_clothing(current_group=current_group, entity_value=entity_value)
-                    current_group.clear()
-                # Update Gender Field
-                elif "gender" in entity_key:
-                    self.__update_gender(current_group=current_group, entity_value=entity_value)
-                    current_group.clear()                
-
-        # Update LINE Fields if current_group is not empty - that is, there are LINE entities at the end of the utterance.
-        if current_group:
-            if self.__update_line(current_group, update=True) is False:
-                return False
-            current_group.clear()
-            line_flag = False
-                
-        return True 
+        Returns:
+        - bool: True if the entity was used and the current group must be cleared, False otherwise.
+        """
+        # Update Clothing Fields
+        if "clothing" in entity_key:  
+            self.__update_clothing(current_group=current_group, entity_value=entity_value)
+            return True
+        # Update Gender Field
+        elif "gender" in entity_key:
+            self.__update_gender(current_group=current_group, entity_value=entity_value)
+            return True
+        return False
 
     def filteringJSON(self):
         """
         Filter the JSON data based on the criteria specified in the 'foi' (fields of interest) dictionary.
 
-        This method reads JSON data from the specified file, filters the data based on gender, clothing items (hat and bag),
-        and LINE-related criteria (Line passages). The filtered data is then returned.
+        This method uses the JSON data passed to the constructor (or reads it from the specified file if none was given),
+        filters the data based on gender, clothing items (hat and bag), and LINE-related criteria (Line passages).
+        The filters are applied as boolean masks over the NumPy columns of the people, fused into one compiled pass when numba is installed. The filtered data is then returned.
 
         Parameters:
         - None
@@ -118,67 +300,91 @@ class TrackingPeople:
         - None
 
         """
-        doi = dict()    # Data of Interest Dict
-
-        with open(self.filepath, 'r') as f:
-            data = json.load(f)
-            doi = data["people"]
-                    
-            # Filter gender, hat, bag
-            foi_gender_hat_bag = {key: value for key, value in list(self.foi.items())[0:3] if value is not None}
-
-            if foi_gender_hat_bag:
-                doi = [person for person in data['people'] if all(
-                    person[key] == value
-                    for key, value in foi_gender_hat_bag.items()
-                )]
-
-            # Counting line passages for each person
-            for person in doi:
-                    for line in range(1, 5):
-                        person[f"line{line}_passages"] = person["trajectory"].count(line)
-                        
-            # Filter lines
-            foi_line = {key: value for key, value in list(self.foi.items())[3:7] if value is not None}
-
-            if foi_line:
-                        
-                doi = [person for person in doi if all(
-                    (person[key] >= value[0] if value[1] else person[key] < value[0])
-                    for key, value in foi_line.items()
-                )]
-                
-
-            self.nop = len(doi)  # Update the number of people after filtering.
-
-            return doi               
+        people, mask = self.__match_mask()
+        doi = [people[i] for i in np.flatnonzero(mask)]    # Data of Interest
+
+        self.nop = len(doi)  # Update the number of people after filtering.
+
+        return doi               
+
+    def count_matches(self):
+        """
+        Count the people meeting the criteria of the 'foi' (fields of interest) dictionary, without building
+        the list of filtered people, for the callers that only need their number.
+
+        Returns:
+        - int: The number of people after filtering, also stored in 'nop'.
+        """
+        people, mask = self.__match_mask()
+        self.nop = int(np.count_nonzero(mask))
+        return self.nop
 
     def __str__(self) -> str:
         people_string = "people of " + self.foi["gender"] + " gender" if self.foi["gender"] is not None else "people"
         output_string = []
         output_string.append("bag" if self.foi["bag"] is True else "no bag" if self.foi["bag"] is False else None)
         output_string.append("hat" if self.foi["hat"] is True else "no hat" if self.foi["hat"] is False else None)
-        if self.foi["line1_passages"]:
-            passages_string = ("once" if self.foi["line1_passages"][0] == 1 else "twice" if self.foi["line1_passages"][0] == 2 else f'{self.foi["line1_passages"][0]} times')
-            line_string = "have crossed at least " + passages_string if self.foi["line1_passages"][1] is True else "have not crossed at least " + passages_string if self.foi["line1_passages"][1] is False else None
-            output_string.append(line_string + " the " + self.line_1)
-        if self.foi["line2_passages"]:
-            passages_string = ("once" if self.foi["line2_passages"][0] == 1 else "twice" if self.foi["line2_passages"][0] == 2 else f'{self.foi["line2_passages"][0]} times')
-            line_string = "have crossed at least " + passages_string if self.foi["line2_passages"][1] is True else "have not crossed at least " + passages_string if self.foi["line2_passages"][1] is False else None
-            output_string.append(line_string + " the " + self.line_2)  
-        if self.foi["line3_passages"]:
-            passages_string = ("once" if self.foi["line3_passages"][0] == 1 else "twice" if self.foi["line3_passages"][0] == 2 else f'{self.foi["line3_passages"][0]} times')
-            line_string = "have crossed at least " + passages_string if self.foi["line3_passages"][1] is True else "have not crossed at least " + passages_string if self.foi["line3_passages"][1] is False else None
-            output_string.append(line_string + " the " + self.line_3) 
-        if self.foi["line4_passages"]:
-            passages_string = ("once" if self.foi["line4_passages"][0] == 1 else "twice" if self.foi["line4_passages"][0] == 2 else f'{self.foi["line4_passages"][0]} times')
-            line_string = "have crossed at least " + passages_string if self.foi["line4_passages"][1] is True else "have not crossed at least " + passages_string if self.foi["line4_passages"][1] is False else None
-            output_string.append(line_string + " the " + self.line_4)       
+        for line, line_name in enumerate((self.line_1, self.line_2, self.line_3, self.line_4), start=1):
+            line_passages = self.foi[f"line{line}_passages"]
+            if line_passages:
+                passages, crossed = line_passages[0], line_passages[1]
+                passages_string = passage_phrase(passages)
+                output_string.append(("have crossed at least " if crossed else "have not crossed at least ") + passages_string + " the " + line_name)
         attributes = [item for item in output_string if item is not None]
         attribute_str = ', '.join(item for item in attributes)
         return f"There are currently {self.nop} {people_string} in the mall that meet the required specifications: {attribute_str}." if attributes else f"There are currently {self.nop} {people_string} in the mall."
 
     # Private Methods
+    def __match_mask(self):
+        """
+        Compute the boolean mask of the people meeting the criteria of the 'foi' (fields of interest) dictionary.
+
+        Returns:
+        - tuple: The people of the JSON data and the mask of the ones to keep.
+        """
+        # Fields of interest to filter on, taken by key before touching the data, in the order they are tested
+        foi_gender_hat_bag = [(key, self.foi[key]) for key in ATTRIBUTE_FILTER_ORDER if self.foi[key] is not None]
+        foi_line = sorted(((key, self.foi[key]) for key in LINE_COLUMNS if self.foi[key] is not None), key=_line_filter_order)
+
+        data = self.__load()
+        people = data["people"]
+        columns, genders = _people_columns(people)
+
+        if _match_people_kernel is not None:
+            return people, _match_people_kernel(*(columns[key] for key in PEOPLE_COLUMNS), *_filter_arguments(self.foi, genders))
+
+        # Filters on gender, hat, bag, then on the lines
+        filters = []
+        for key, value in foi_gender_hat_bag:
+            if key == "gender":
+                # compare the gender codes, -1 matching nobody when the gender is not in the data
+                value = genders.get(value, -1)
+            filters.append((key, lambda column, value=value: column == value))
+        for key, (passages, crossed) in foi_line:
+            filters.append((key, (lambda column, passages=passages: column >= passages) if crossed else (lambda column, passages=passages: column < passages)))
+
+        # Test each filter only on the people still matching, stopping as soon as nobody is left
+        matching = np.arange(len(people))
+        for key, keep in filters:
+            if matching.size == 0:
+                break
+            matching = matching[np.broadcast_to(keep(columns[key][matching]), matching.shape)]
+
+        mask = np.zeros(len(people), dtype=bool)
+        mask[matching] = True
+        return people, mask
+
+    def __load(self):
+        """
+        Return the JSON data passed to the constructor, or the cached content of the specified file if none was given.
+
+        Returns:
+        - dict: The parsed JSON data.
+        """
+        if self.data is not None:
+            return self.data
+        return load_json_file(self.filepath)
+
     def __update_line(self, current_group, update = False):
         """
         Update LINE information based on the provided group and optional parameters.
@@ -202,14 +408,9 @@ class TrackingPeople:
                 return False
             
             if line is not None:
-                if line.lower() == self.line_1:
-                    self.foi["line1_passages"] = (passages, neg_passages and neg_line)
-                elif line.lower() == self.line_2:
-                    self.foi["line2_passages"] = (passages, neg_passages and neg_line)
-                elif line.lower() == self.line_3:
-                    self.foi["line3_passages"] = (passages, neg_passages and neg_line)
-                elif line.lower() == self.line_4:
-                    self.foi["line4_passages"] = (passages, neg_passages and neg_line)
+                line_key = self._line_map.get(line.lower())
+                if line_key is not None:
+                    self.foi[line_key] = (passages, neg_passages and neg_line)
                 else:
                     self.dispatcher.utter_message(text=f"My apologies! I don't know if there is {str(line)} in the shopping mall. I can only check the people passing through {str(self.line_1)}, {str(self.line_2)}, {str(self.line_3)}, and {str(self.line_4)}.")
                     return False
@@ -254,13 +455,14 @@ class TrackingPeople:
         """
         neg = not "negation" in current_group
 
-        self.foi["gender"] = entity_value if neg is True else "female" if entity_value == "male" and neg is False else "male"        
+        self.foi["gender"] = entity_value if neg is True else OPPOSITE_GENDER.get(entity_value, "male")
         
 
 class TrackingGroups:
     
-    def __init__(self, filepath, dispatcher, entities = None) -> None:
+    def __init__(self, filepath, dispatcher, entities = None, data = None) -> None:
         self.filepath = filepath
+        self.data = data
         self.foi = {
             "score": None
         }
@@ -284,86 +486,43 @@ class TrackingGroups:
         Raises:
         - None
         """
-        # Initialize an empty dictionary to store the current group of entities.
-        current_group = dict()  
-        # Initialize a flag to track whether score field are being updated.
-        score_flag = False
-
-        for entity in self.entities:
-
-            entity_key = entity['entity']
-            entity_value = entity['value']
-            
-            if entity_key in ["mark"]:
-                if score_flag is True and entity_key in current_group:
-                    if self.__update_score(current_group, update=True) is False:
-                        return False
-                    key, value = next(reversed(current_group.items()))
-                    current_group.clear()
-                    if key == "negation":
-                        current_group[key] = value                    
-                score_flag = True
-                neg = False if "negation" in current_group else True
-                if not neg:
-                    del current_group["negation"]
-                current_group[entity_key] = (entity_value, neg)                 
-            else:
-                if score_flag is True and entity_key == "negation":
-                    pass
-                else: 
-                    if score_flag is True and entity_key != "negation":
-                        if self.__update_score(current_group, update=True) is False:
-                            return False
-                        current_group.clear()
-                    score_flag = False
-                current_group[entity_key] = entity_value
-            
-            if all(key in current_group for key in ["mark"]):
-                if self.__update_score(current_group, update=True) is False:
-                    return False
-                current_group.clear()
-                score_flag = False            
-
-        if current_group:
-            if self.__update_score(current_group, update=True) is False:
-                return False
-            current_group.clear()
-                
-        return True 
+        return _run_state_machine(self.entities, MARK_ENTITIES, lambda current_group: self.__update_score(current_group, update=True))
 
     def filteringJSON(self):
         """
         Filter the JSON data based on the criteria specified in the 'foi' (fields of interest) dictionary.
 
-        This method reads JSON data from the specified file, filters the data based on score.
+        This method uses the JSON data passed to the constructor (or reads it from the specified file if none was given),
+        filters the data based on score.
         The filtered data is then returned.
 
         Parameters:
         - None
 
         Returns:
-        - list: A list of filtered people based on the data of interest (doi).
+        - list: A new list of the filtered groups based on the data of interest (doi).
 
         Raises:
         - None
 
         """
-        doi = dict()    # Data of Interest Dict
+        doi = list(self.__matching_groups())    # Data of Interest, never the cached groups themselves
 
-        with open(self.filepath, 'r') as f:
-            data = json.load(f)
-            doi = data["groups"]
-            
-            foi_score = {key: value for key, value in list(self.foi.items())[0:1] if value is not None}
+        self.nop = len(doi)  # Update the number of groups after filtering.
 
-            if foi_score:
-                doi = [person for person in doi if all(
-                    (person[key] >= value[0]) if value[1] is True else (person[key] < value[0]) for key, value in foi_score.items()
-                )]
+        return doi 
 
-            self.nop = len(doi)  # Update the number of people after filtering.
+    def count_matches(self):
+        """
+        Count the groups meeting the criteria of the 'foi' (fields of interest) dictionary, without building
+        the list of filtered groups, for the callers that only need their number.
 
-            return doi 
+        Returns:
+        - int: The number of groups after filtering, also stored in 'nop'.
+        """
+        matching_groups = self.__matching_groups()
+        self.nop = len(matching_groups) if isinstance(matching_groups, (list, tuple)) else sum(1 for _ in matching_groups)
+        return self.nop
 
     def __str__(self) -> str:
         output_string = []
@@ -375,6 +534,34 @@ class TrackingGroups:
         
         return f"There are {self.nop} groups that have participated in the contets that meet the required specifications: {attribute_str}." if attributes else f"There are {self.nop} groups that have participated in the contets."
 
+    def __matching_groups(self):
+        """
+        Return the groups meeting the criteria of the 'foi' (fields of interest) dictionary: all the groups
+        when there is no criterion, a lazy generator otherwise.
+        """
+        data = self.__load()
+        groups = data["groups"]
+
+        if self.foi["score"] is None:
+            return groups
+
+        # the single score test is chosen once, instead of for every group
+        score, at_least = self.foi["score"][0], self.foi["score"][1] is True
+        if at_least:
+            return (group for group in groups if group["score"] >= score)
+        return (group for group in groups if group["score"] < score)
+
+    def __load(self):
+        """
+        Return the JSON data passed to the constructor, or the cached content of the specified file if none was given.
+
+        Returns:
+        - dict: The parsed JSON data.
+        """
+        if self.data is not None:
+            return self.data
+        return load_json_file(self.filepath)
+
     def __update_score(self, current_group, update = False):
         """
         Update score information based on the provided group and optional parameters.
@@ -1,4 +1,104 @@
+import functools
+import os
+
 from word2number import w2n
+from rasa_sdk.events import SlotSet
+
+# JSON parser for the data files, all taking the raw bytes of the file: orjson and ujson parse noticeably
+# faster than the standard library json module, so the fastest installed one is used
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    try:
+        from ujson import loads as json_loads
+    except ImportError:
+        from json import loads as json_loads
+
+# Parsed JSON data files by path: the last (modification time, size) of the file ("stamp"), the parsed content ("data"),
+# the structures derived from it ("index") and the function building them ("build_index")
+_JSON_FILE_CACHES = {}
+
+def json_file_cache(filepath):
+    """
+    Returns the cache entry of a JSON data file, shared by all the modules reading that file.
+    """
+    return _JSON_FILE_CACHES.setdefault(filepath, {"stamp": None, "data": None, "index": None, "build_index": None})
+
+def load_json_file(filepath, build_index=None):
+    """
+    Returns the parsed content of a JSON file, re-reading it only when its modification time or size changes.
+    A single stat call per request keeps the cached data and its derived structures valid across requests.
+
+    Parameters:
+    - filepath (str): The path of the JSON file.
+    - build_index (callable, optional): Function rebuilding the derived structures ("index" of json_file_cache)
+      each time the file is re-read. Once given, it is kept for the file even when later calls omit it.
+
+    Returns:
+    - dict: The parsed JSON data.
+    """
+    cache = json_file_cache(filepath)
+    if build_index is not None and cache["build_index"] is not build_index:
+        cache["build_index"] = build_index
+        cache["stamp"] = None
+    stat = os.stat(filepath)
+    # nanosecond mtime plus size, so that an edit within the timestamp resolution is still noticed
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    if stamp != cache["stamp"]:
+        with open(filepath, 'rb') as f:
+            cache["data"] = json_loads(f.read())
+        if cache["build_index"] is not None:
+            cache["index"] = cache["build_index"](cache["data"])
+        cache["stamp"] = stamp
+    return cache["data"]
+
+# Frequency adverbs that are not written as "<number> times"
+FIXED_ADVERBS = {"once": 1, "one time": 1, "twice": 2}
+
+# Wording of the smallest numbers of passages through a line, the other ones being "<number> times"
+PASSAGE_PHRASES = {1: "once", 2: "twice"}
+
+def passage_phrase(passages):
+    """
+    Converts a number of passages into its frequency adverb ("once", "twice" or "<n> times").
+    """
+    return PASSAGE_PHRASES.get(passages, f"{passages} times")
+
+# Default answer when the user gives more than one detail in a contest question
+MORE_THAN_ONE_MESSAGE = "I am so sorry, I can only handle one detail at a time for this kind of question. Please stop the conversation, then rephrase the question by denoting only one group or one member or one position."
+
+@functools.lru_cache(maxsize=128)
+def _adverb_to_number(adverb):
+    """
+    Converts a frequency adverb ("once", "twice", "3 times", ...) to an int, or None if it is not a valid adverb.
+    The conversion is pure, so it is cached like _word_to_number.
+    """
+    if adverb in FIXED_ADVERBS:
+        return FIXED_ADVERBS[adverb]
+    if adverb.endswith(" times"):
+        try:
+            number = adverb.split(" times")[0]
+            return w2n.word_to_num(number)
+        except ValueError:
+            return None
+    return None
+
+@functools.lru_cache(maxsize=128)
+def _word_to_number(word):
+    """
+    Converts a number written in digits or in words to an int or a float, or None if it is not a number.
+    The conversion is pure, so it is cached: the slots only ever hold a handful of distinct numbers.
+    """
+    try:
+        return int(word)  
+    except ValueError:
+        try:
+            return float(word)  
+        except ValueError:
+            try:
+                return w2n.word_to_num(word)
+            except ValueError:
+                return None
 
 class Utils:
         
@@ -30,32 +130,46 @@ class Utils:
         None
         """
         
-        if adverb == "once" or adverb == "one time":
-            return 1
-        elif adverb == "twice":
-            return 2
-        elif adverb.endswith(" times"):
-            try:
-                number = adverb.split(" times")[0]
-                return w2n.word_to_num(number)
-            except ValueError:
-                dispatcher.utter_message(text=f"My apologies! Please, provide a right frequency adverb in the format (once, twice, 'number' times). You provided me the following frequency adverb: {str(adverb)}.")
-                return None
-        else:
+        number = _adverb_to_number(adverb)
+        if number is None:
             dispatcher.utter_message(text=f"My apologies! Please, provide a right frequency adverb in the format (once, twice, 'number' times). You provided me the following frequency adverb: {str(adverb)}.")
-            return None
+        return number
     
         
     @staticmethod
     def word_to_number(word, dispatcher):
-        try:
-            return int(word)  
-        except ValueError:
-            try:
-                return float(word)  
-            except ValueError:
-                try:
-                    return w2n.word_to_num(word)
-                except ValueError:
-                    dispatcher.utter_message(text=f"My apologies! Please, provide a right number. You provided me: {str(word)}.")
-                    return None
+        number = _word_to_number(word)
+        if number is None:
+            dispatcher.utter_message(text=f"My apologies! Please, provide a right number. You provided me: {str(word)}.")
+        return number
+
+    @staticmethod
+    def handle_preamble(tracker, dispatcher, more_than_one_message=MORE_THAN_ONE_MESSAGE, handle_zero=True):
+        """
+        Answer the error states of the last_updated slot shared by the contest questions.
+
+        Parameters:
+        - tracker (Tracker): The conversation tracker.
+        - dispatcher (CollectingDispatcher): The dispatcher used to utter the error message.
+        - more_than_one_message (str): The message to utter when the user gave more than one detail.
+        - handle_zero (bool): Whether to answer the "zero" state, i.e. no detail was given.
+
+        Returns:
+        - list or None: The events to return from the action if an error state was answered, None otherwise.
+        """
+
+        last_updated = tracker.get_slot("last_updated")
+
+        if last_updated == "zero" and handle_zero:
+            dispatcher.utter_message(text="Sorry, I did not understand who or what I need to research on. Could you rephrase please?")
+            return []
+
+        if last_updated == "more than one":
+            dispatcher.utter_message(text=more_than_one_message)
+            return [SlotSet("member_group", None), SlotSet("position", None), SlotSet("group_ID", None)]
+
+        if last_updated == "wrong entity":
+            dispatcher.utter_message(text="You provided a wrong entity for this type of research. Please rephrase.")
+            return []
+
+        return None
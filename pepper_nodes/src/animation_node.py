@@ -1,6 +1,6 @@
 #!/usr/bin/python3
-import numpy
 import rospy
+import time
 
 from optparse import OptionParser
 from std_msgs.msg import String
@@ -8,6 +8,16 @@ from session import *
 
 from pepper_nodes.srv import AnimationService, AnimationServiceResponse
 
+# Seconds to wait before each new attempt when the animated speech fails
+RETRY_DELAYS = (0.05, 0.2, 1.0)
+
+# Failures of the animated speech that may come from a lost connection. qi raises RuntimeError for any NAOqi
+# failure (a malformed animation string too), so they are only retried when the connection is actually lost
+RETRY_ERRORS = (RuntimeError, ConnectionError)
+
+# Lowercase words of the qi error messages telling that the connection to the robot was lost
+CONNECTION_LOST_MARKERS = ("socket", "disconnected", "not connected", "connection")
+
 class AnimationNode():
    '''
    A ROS (Robot Operating System) node designed for controlling animations in a robot. 
@@ -18,6 +28,8 @@ class AnimationNode():
    Attributes:
    - _session (Session): A session object for communication with the robot.
    - _animation (ALAnimationPlayer): The animation player service used to run animations on the robot.
+   - _say (callable): The bound say method of the animated speech service, rebound when the service is fetched again.
+   - _CONFIG (dict): The configuration passed to the animated speech, shared by all the requests.
 
    Methods:
    - __init__(self, ip, port): Initializes the animation node, setting up a session and the animation service.
@@ -25,6 +37,8 @@ class AnimationNode():
    - __animate(self, msg: AnimationService) -> AnimationServiceResponse: Handles the animation requests 
       based on the input message and executes the corresponding animation on the robot.
    '''
+
+   _CONFIG = {"bodyLanguageMode":"contextual"}
       
    def __init__(self, ip, port):
       '''
@@ -37,6 +51,7 @@ class AnimationNode():
       '''
       self._session = Session(ip, port)
       self._animation = self._session.get_service("ALAnimatedSpeech")
+      self._say = self._animation.say
 
    def __call__(self):
       '''
@@ -54,8 +69,10 @@ class AnimationNode():
    def __animate(self, msg: AnimationService) -> AnimationServiceResponse:
         '''
         Handles animation requests by interpreting the input command and executing the corresponding animation.
-        Supports predefined animations as well as custom animation strings. In case of an exception, it resets 
-        the animation service and retries the animation execution.
+        Supports predefined animations as well as custom animation strings. When the connection is lost, it retries 
+        the animation execution after the delays in RETRY_DELAYS, reconnecting the session and fetching the 
+        animation service again if the session was lost. The service is fetched again before the last attempt
+        anyway, in case ALAnimatedSpeech was restarted while the session stayed connected.
 
         Args:
         - msg (AnimationService): The input message containing the animation command.
@@ -63,16 +80,45 @@ class AnimationNode():
         Returns:
             AnimationServiceResponse: A response message indicating the completion of the animation request.
         '''
+        animation_str = msg.input.data
         try:
-            animation_str = msg.input.data
-            configuration = {"bodyLanguageMode":"contextual"}
             #rospy.loginfo(animation_str)
-            self._animation.say(animation_str, configuration)
-        except Exception as e:
-            self._session.reconnect()
-            self._animation = self._session.get_service("ALAnimatedSpeech")
-            self._animation.say(animation_str, configuration)
-            pass
+            self._say(animation_str, self._CONFIG)
+        except RETRY_ERRORS as error:
+            # any other NAOqi failure is reported at once, without waiting for the retries
+            if not self.__connection_lost(error):
+                raise
+            for attempt, delay in enumerate(RETRY_DELAYS, start=1):
+                time.sleep(delay)
+                last_attempt = attempt == len(RETRY_DELAYS)
+                reconnect = not self._session.session.isConnected()
+                if reconnect:
+                    self._session.reconnect()
+                if reconnect or last_attempt:
+                    self._animation = self._session.get_service("ALAnimatedSpeech")
+                    self._say = self._animation.say
+                try:
+                    self._say(animation_str, self._CONFIG)
+                    return
+                except RETRY_ERRORS as error:
+                    # give up after the last attempt, like the single retry did before
+                    if last_attempt or not self.__connection_lost(error):
+                        raise
+
+   def __connection_lost(self, error):
+      '''
+      Tells whether a failure of the animated speech comes from a lost connection to the robot.
+
+      Args:
+      - error (Exception): The exception raised by the animated speech.
+
+      Returns:
+         bool: True if the session is disconnected or the error reports a lost connection, False otherwise.
+      '''
+      if isinstance(error, ConnectionError) or not self._session.session.isConnected():
+         return True
+      message = str(error).lower()
+      return any(marker in message for marker in CONNECTION_LOST_MARKERS)
 
 if __name__ == "__main__":
    parser = OptionParser()